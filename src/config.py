@@ -1,116 +1,166 @@
 import os
+from types import MappingProxyType
+
+import numpy as np
+
+__all__ = [
+    "RESULTS_PATH",
+    "DATA_PATH",
+    "RAW_DATA_PATH",
+    "PROCESSED_DATA_PATH",
+    "SAMPLED_DATA_PATH",
+    "XES_OUTPUT_PATH",
+    "CACHE_PATH",
+    "PROCESS_DISCOVERY",
+    "IM_MODEL_PATH",
+    "HM_MODEL_PATH",
+    "PTREE_PATH",
+    "IM_IMAGE_PATH",
+    "HM_IMAGE_PATH",
+    "PERFORMANCE_PATH",
+    "PERFORMANCE_LOG_PATH",
+    "PERFORMANCE_GROUPS_PATH",
+    "CONFORMANCE_PATH",
+    "CONFORMANCE_LOG_PATH",
+    "CONFORMANCE_REPORT_PATH",
+    "MODEL_FILE",
+    "EVENT_LOG_FILE",
+    "SAMPLE_FRACTION",
+    "RECOMMENDED_CURRICULUM",
+    "COURSE_IDS",
+    "SEMESTERS",
+    "CURRICULUM_REQUIREMENTS",
+    "COURSE_GROUPS",
+]
+
+# Paths are built once at import from fixed, relative components, so plain
+# separator concatenation is enough (no os.path.join normalisation needed).
+_SEP = os.sep
 
 # ======================================
 # data_preparation.py Configurations
 # ======================================
-RESULTS_PATH = os.path.join("results")
-DATA_PATH = os.path.join("results", "data")
-RAW_DATA_PATH = os.path.join(DATA_PATH, "DTU_dataset.xlsx")
-PROCESSED_DATA_PATH = os.path.join(DATA_PATH, "processed_log.csv")
-SAMPLED_DATA_PATH = os.path.join(DATA_PATH, "sampled_log.csv")
-XES_OUTPUT_PATH = os.path.join(DATA_PATH, "sampled_event_log.xes")
+RESULTS_PATH = "results"
+DATA_PATH = RESULTS_PATH + _SEP + "data"
+RAW_DATA_PATH = DATA_PATH + _SEP + "DTU_dataset.xlsx"
+PROCESSED_DATA_PATH = DATA_PATH + _SEP + "processed_log.csv"
+SAMPLED_DATA_PATH = DATA_PATH + _SEP + "sampled_log.csv"
+XES_OUTPUT_PATH = DATA_PATH + _SEP + "sampled_event_log.xes"
+
+# Pickled parses of XES/PNML inputs (see utils.load_cached)
+CACHE_PATH = RESULTS_PATH + _SEP + ".cache"
 
 # ======================================
-# model_training.py Configurations
+# process_discovery.py Configurations
 # ======================================
-PROCESS_DISCOVERY = os.path.join("results", "process_discovery")
-IM_MODEL_PATH = os.path.join(PROCESS_DISCOVERY, "inductive_miner.pnml")
-HM_MODEL_PATH = os.path.join(PROCESS_DISCOVERY, "heuristics_miner.pnml")
-PTREE_PATH = os.path.join(PROCESS_DISCOVERY, "process_tree.png")
+PROCESS_DISCOVERY = RESULTS_PATH + _SEP + "process_discovery"
+IM_MODEL_PATH = PROCESS_DISCOVERY + _SEP + "inductive_miner.pnml"
+HM_MODEL_PATH = PROCESS_DISCOVERY + _SEP + "heuristics_miner.pnml"
+PTREE_PATH = PROCESS_DISCOVERY + _SEP + "process_tree.png"
 
 # Visualization Outputs
-IM_IMAGE_PATH = os.path.join(PROCESS_DISCOVERY, "inductive_miner.png")
-HM_IMAGE_PATH = os.path.join(PROCESS_DISCOVERY, "heuristics_miner.png")
+IM_IMAGE_PATH = PROCESS_DISCOVERY + _SEP + "inductive_miner.png"
+HM_IMAGE_PATH = PROCESS_DISCOVERY + _SEP + "heuristics_miner.png"
 
 # ======================================
 # performance_analysis.py Configurations
 # ======================================
-PERFORMANCE_PATH = os.path.join("results", "performance_analysis")
-PERFORMANCE_LOG_PATH = os.path.join(PERFORMANCE_PATH, "performance_log.txt")
+PERFORMANCE_PATH = RESULTS_PATH + _SEP + "performance_analysis"
+PERFORMANCE_LOG_PATH = PERFORMANCE_PATH + _SEP + "performance_log.txt"
+PERFORMANCE_GROUPS_PATH = PERFORMANCE_PATH + _SEP + "groups"
 
 # ======================================
 # conformance_checking.py Configurations
 # ======================================
 # Paths for conformance checking
-CONFORMANCE_PATH = os.path.join("results", "conformance_checking")
-CONFORMANCE_LOG_PATH = os.path.join(CONFORMANCE_PATH, "conformance_log.txt")
+CONFORMANCE_PATH = RESULTS_PATH + _SEP + "conformance_checking"
+CONFORMANCE_LOG_PATH = CONFORMANCE_PATH + _SEP + "conformance_log.txt"
+CONFORMANCE_REPORT_PATH = CONFORMANCE_PATH + _SEP + "conformance_report.txt"
 
 # Petri net model to use (you can swap between miners later)
-MODEL_FILE = os.path.join("results", "models", "inductive_miner.pnml")
-EVENT_LOG_FILE = os.path.join("results", "data", "sampled_event_log.xes")
+MODEL_FILE = RESULTS_PATH + _SEP + "models" + _SEP + "inductive_miner.pnml"
+EVENT_LOG_FILE = XES_OUTPUT_PATH
 
 # Sampling Configuration
 SAMPLE_FRACTION = 0.05  # 5% sample for quicker processing
 
 # Recommend Curriculum
-RECOMMENDED_CURRICULUM = {
+RECOMMENDED_CURRICULUM = MappingProxyType({
     # Semester 1 - Polyteknisk Grundlag + Core Software
-    "01001": {"semester": 1, "type": "mandatory", "prerequisites": [], "ects": 10, "block": "Polyteknisk grundlag"},
-    "01002": {"semester": 1, "type": "mandatory", "prerequisites": [], "ects": 10, "block": "Polyteknisk grundlag"},
-    "02100": {"semester": 1, "type": "mandatory", "prerequisites": [], "ects": 5, "block": "Retningsspecifikke"},
-    "10060": {"semester": 1, "type": "mandatory", "prerequisites": [], "ects": 10, "block": "Polyteknisk grundlag"},
+    "01001": {"semester": 1, "type": "mandatory", "prerequisites": (), "ects": 10, "block": "Polyteknisk grundlag"},
+    "01002": {"semester": 1, "type": "mandatory", "prerequisites": (), "ects": 10, "block": "Polyteknisk grundlag"},
+    "02100": {"semester": 1, "type": "mandatory", "prerequisites": (), "ects": 5, "block": "Retningsspecifikke"},
+    "10060": {"semester": 1, "type": "mandatory", "prerequisites": (), "ects": 10, "block": "Polyteknisk grundlag"},
     
     # Semester 2 - Polyteknisk Grundlag continued + Software foundations
-    "01017": {"semester": 2, "type": "mandatory", "prerequisites": [], "ects": 5, "block": "Retningsspecifikke"},
-    "02104": {"semester": 2, "type": "mandatory", "prerequisites": ["02100"], "ects": 5, "block": "Retningsspecifikke"},
-    "02105": {"semester": 2, "type": "mandatory", "prerequisites": ["02100"], "ects": 5, "block": "Retningsspecifikke"},
-    "27020": {"semester": 2, "type": "mandatory", "prerequisites": [], "ects": 5, "block": "Polyteknisk grundlag"},
+    "01017": {"semester": 2, "type": "mandatory", "prerequisites": (), "ects": 5, "block": "Retningsspecifikke"},
+    "02104": {"semester": 2, "type": "mandatory", "prerequisites": ("02100",), "ects": 5, "block": "Retningsspecifikke"},
+    "02105": {"semester": 2, "type": "mandatory", "prerequisites": ("02100",), "ects": 5, "block": "Retningsspecifikke"},
+    "27020": {"semester": 2, "type": "mandatory", "prerequisites": (), "ects": 5, "block": "Polyteknisk grundlag"},
     # Statistics choice (one of):
-    "02402": {"semester": 2, "type": "restricted_choice", "prerequisites": ["01001"], "ects": 5, "block": "Polyteknisk grundlag", "group": "STAT-CHOOSE-1"},
-    "02403": {"semester": 2, "type": "restricted_choice", "prerequisites": ["01001"], "ects": 5, "block": "Polyteknisk grundlag", "group": "STAT-CHOOSE-1"},
+    "02402": {"semester": 2, "type": "restricted_choice", "prerequisites": ("01001",), "ects": 5, "block": "Polyteknisk grundlag", "group": "STAT-CHOOSE-1"},
+    "02403": {"semester": 2, "type": "restricted_choice", "prerequisites": ("01001",), "ects": 5, "block": "Polyteknisk grundlag", "group": "STAT-CHOOSE-1"},
     # Chemistry choice (one of):
-    "26020": {"semester": 2, "type": "restricted_choice", "prerequisites": [], "ects": 5, "block": "Polyteknisk grundlag", "group": "CHEM-CHOOSE-1"},
-    "26021": {"semester": 2, "type": "restricted_choice", "prerequisites": [], "ects": 5, "block": "Polyteknisk grundlag", "group": "CHEM-CHOOSE-1"},
-    "26022": {"semester": 2, "type": "restricted_choice", "prerequisites": [], "ects": 5, "block": "Polyteknisk grundlag", "group": "CHEM-CHOOSE-1"},
+    "26020": {"semester": 2, "type": "restricted_choice", "prerequisites": (), "ects": 5, "block": "Polyteknisk grundlag", "group": "CHEM-CHOOSE-1"},
+    "26021": {"semester": 2, "type": "restricted_choice", "prerequisites": (), "ects": 5, "block": "Polyteknisk grundlag", "group": "CHEM-CHOOSE-1"},
+    "26022": {"semester": 2, "type": "restricted_choice", "prerequisites": (), "ects": 5, "block": "Polyteknisk grundlag", "group": "CHEM-CHOOSE-1"},
     
     # Semester 3 - Core Software courses
-    "02132": {"semester": 3, "type": "mandatory", "prerequisites": ["02100"], "ects": 10, "block": "Retningsspecifikke"},
-    "02141": {"semester": 3, "type": "mandatory", "prerequisites": ["01017"], "ects": 10, "block": "Retningsspecifikke"},
-    "02157": {"semester": 3, "type": "mandatory", "prerequisites": ["02105"], "ects": 5, "block": "Retningsspecifikke"},
-    "02161": {"semester": 3, "type": "mandatory", "prerequisites": ["02100"], "ects": 5, "block": "Retningsspecifikke"},
+    "02132": {"semester": 3, "type": "mandatory", "prerequisites": ("02100",), "ects": 10, "block": "Retningsspecifikke"},
+    "02141": {"semester": 3, "type": "mandatory", "prerequisites": ("01017",), "ects": 10, "block": "Retningsspecifikke"},
+    "02157": {"semester": 3, "type": "mandatory", "prerequisites": ("02105",), "ects": 5, "block": "Retningsspecifikke"},
+    "02161": {"semester": 3, "type": "mandatory", "prerequisites": ("02100",), "ects": 5, "block": "Retningsspecifikke"},
     
     # Semester 4 - Restricted choice + electives start
     # STS choice (one of):
-    "42620": {"semester": 4, "type": "restricted_choice", "prerequisites": [], "ects": 5, "block": "Polyteknisk grundlag", "group": "STS-CHOOSE-1"},
-    "42622": {"semester": 4, "type": "restricted_choice", "prerequisites": [], "ects": 5, "block": "Polyteknisk grundlag", "group": "STS-CHOOSE-1"},
+    "42620": {"semester": 4, "type": "restricted_choice", "prerequisites": (), "ects": 5, "block": "Polyteknisk grundlag", "group": "STS-CHOOSE-1"},
+    "42622": {"semester": 4, "type": "restricted_choice", "prerequisites": (), "ects": 5, "block": "Polyteknisk grundlag", "group": "STS-CHOOSE-1"},
     # Retningsspecifikke choice (≥5 ECTS from):
-    "02155": {"semester": 4, "type": "restricted_choice", "prerequisites": ["02132"], "ects": 5, "block": "Retningsspecifikke", "group": "RSPEC-CHOOSE-5ECTS"},
-    "02156": {"semester": 4, "type": "restricted_choice", "prerequisites": ["02141"], "ects": 5, "block": "Retningsspecifikke", "group": "RSPEC-CHOOSE-5ECTS"},
-    "02159": {"semester": 4, "type": "restricted_choice", "prerequisites": ["02132"], "ects": 5, "block": "Retningsspecifikke", "group": "RSPEC-CHOOSE-5ECTS"},
+    "02155": {"semester": 4, "type": "restricted_choice", "prerequisites": ("02132",), "ects": 5, "block": "Retningsspecifikke", "group": "RSPEC-CHOOSE-5ECTS"},
+    "02156": {"semester": 4, "type": "restricted_choice", "prerequisites": ("02141",), "ects": 5, "block": "Retningsspecifikke", "group": "RSPEC-CHOOSE-5ECTS"},
+    "02159": {"semester": 4, "type": "restricted_choice", "prerequisites": ("02132",), "ects": 5, "block": "Retningsspecifikke", "group": "RSPEC-CHOOSE-5ECTS"},
     # Typical electives semester 4 (10 ECTS)
-    "02162": {"semester": 4, "type": "elective", "prerequisites": ["02161"], "ects": 10, "block": "Valgfrie"},
-    "02180": {"semester": 4, "type": "elective", "prerequisites": ["02105"], "ects": 5, "block": "Valgfrie"},
+    "02162": {"semester": 4, "type": "elective", "prerequisites": ("02161",), "ects": 10, "block": "Valgfrie"},
+    "02180": {"semester": 4, "type": "elective", "prerequisites": ("02105",), "ects": 5, "block": "Valgfrie"},
     
     # Semester 5 - Project + electives
-    "02122": {"semester": 5, "type": "mandatory", "prerequisites": [], "ects": 10, "block": "Projekter"},
+    "02122": {"semester": 5, "type": "mandatory", "prerequisites": (), "ects": 10, "block": "Projekter"},
     # Common electives semester 5
-    "02225": {"semester": 5, "type": "elective", "prerequisites": ["02132"], "ects": 5, "block": "Valgfrie"},
-    "02231": {"semester": 5, "type": "elective", "prerequisites": ["01017"], "ects": 5, "block": "Valgfrie"},
-    "02247": {"semester": 5, "type": "elective", "prerequisites": ["02105"], "ects": 5, "block": "Valgfrie"},
-    "02249": {"semester": 5, "type": "elective", "prerequisites": ["02105"], "ects": 7.5, "block": "Valgfrie"},
-    "02258": {"semester": 5, "type": "elective", "prerequisites": ["02132"], "ects": 5, "block": "Valgfrie"},
-    "02266": {"semester": 5, "type": "elective", "prerequisites": ["02161"], "ects": 5, "block": "Valgfrie"},
+    "02225": {"semester": 5, "type": "elective", "prerequisites": ("02132",), "ects": 5, "block": "Valgfrie"},
+    "02231": {"semester": 5, "type": "elective", "prerequisites": ("01017",), "ects": 5, "block": "Valgfrie"},
+    "02247": {"semester": 5, "type": "elective", "prerequisites": ("02105",), "ects": 5, "block": "Valgfrie"},
+    "02249": {"semester": 5, "type": "elective", "prerequisites": ("02105",), "ects": 7.5, "block": "Valgfrie"},
+    "02258": {"semester": 5, "type": "elective", "prerequisites": ("02132",), "ects": 5, "block": "Valgfrie"},
+    "02266": {"semester": 5, "type": "elective", "prerequisites": ("02161",), "ects": 5, "block": "Valgfrie"},
     
     # Semester 6 - Bachelor project + final electives
-    "BACH-PROJ": {"semester": 6, "type": "mandatory", "prerequisites": [], "ects": 15, "block": "Projekter"},
+    "BACH-PROJ": {"semester": 6, "type": "mandatory", "prerequisites": (), "ects": 15, "block": "Projekter"},
     # Common electives semester 6
-    "02262": {"semester": 6, "type": "elective", "prerequisites": [], "ects": 5, "block": "Valgfrie"},
-    "02267": {"semester": 6, "type": "elective", "prerequisites": ["02162"], "ects": 5, "block": "Valgfrie"},
-    "02269": {"semester": 6, "type": "elective", "prerequisites": [], "ects": 5, "block": "Valgfrie"},
-    "02270": {"semester": 6, "type": "elective", "prerequisites": [], "ects": 5, "block": "Valgfrie"},
-    "02271": {"semester": 6, "type": "elective", "prerequisites": ["02270"], "ects": 5, "block": "Valgfrie"},
-    "02282": {"semester": 6, "type": "elective", "prerequisites": ["02105"], "ects": 7.5, "block": "Valgfrie"},
-    "02285": {"semester": 6, "type": "elective", "prerequisites": ["02180"], "ects": 7.5, "block": "Valgfrie"},
-    "02289": {"semester": 6, "type": "elective", "prerequisites": ["02105"], "ects": 5, "block": "Valgfrie"},
-    "02504": {"semester": 6, "type": "elective", "prerequisites": [], "ects": 5, "block": "Valgfrie"},
-    "02561": {"semester": 6, "type": "elective", "prerequisites": [], "ects": 5, "block": "Valgfrie"},
-    "02562": {"semester": 6, "type": "elective", "prerequisites": [], "ects": 5, "block": "Valgfrie"},
-    "02805": {"semester": 6, "type": "elective", "prerequisites": [], "ects": 10, "block": "Valgfrie"},
-    "02807": {"semester": 6, "type": "elective", "prerequisites": [], "ects": 5, "block": "Valgfrie"},
-    "02810": {"semester": 6, "type": "elective", "prerequisites": [], "ects": 5, "block": "Valgfrie"},
-    "30510": {"semester": 6, "type": "elective", "prerequisites": [], "ects": 5, "block": "Valgfrie"},
-    "42137": {"semester": 6, "type": "elective", "prerequisites": [], "ects": 5, "block": "Valgfie"},
-}
+    "02262": {"semester": 6, "type": "elective", "prerequisites": (), "ects": 5, "block": "Valgfrie"},
+    "02267": {"semester": 6, "type": "elective", "prerequisites": ("02162",), "ects": 5, "block": "Valgfrie"},
+    "02269": {"semester": 6, "type": "elective", "prerequisites": (), "ects": 5, "block": "Valgfrie"},
+    "02270": {"semester": 6, "type": "elective", "prerequisites": (), "ects": 5, "block": "Valgfrie"},
+    "02271": {"semester": 6, "type": "elective", "prerequisites": ("02270",), "ects": 5, "block": "Valgfrie"},
+    "02282": {"semester": 6, "type": "elective", "prerequisites": ("02105",), "ects": 7.5, "block": "Valgfrie"},
+    "02285": {"semester": 6, "type": "elective", "prerequisites": ("02180",), "ects": 7.5, "block": "Valgfrie"},
+    "02289": {"semester": 6, "type": "elective", "prerequisites": ("02105",), "ects": 5, "block": "Valgfrie"},
+    "02504": {"semester": 6, "type": "elective", "prerequisites": (), "ects": 5, "block": "Valgfrie"},
+    "02561": {"semester": 6, "type": "elective", "prerequisites": (), "ects": 5, "block": "Valgfrie"},
+    "02562": {"semester": 6, "type": "elective", "prerequisites": (), "ects": 5, "block": "Valgfrie"},
+    "02805": {"semester": 6, "type": "elective", "prerequisites": (), "ects": 10, "block": "Valgfrie"},
+    "02807": {"semester": 6, "type": "elective", "prerequisites": (), "ects": 5, "block": "Valgfrie"},
+    "02810": {"semester": 6, "type": "elective", "prerequisites": (), "ects": 5, "block": "Valgfrie"},
+    "30510": {"semester": 6, "type": "elective", "prerequisites": (), "ects": 5, "block": "Valgfrie"},
+    "42137": {"semester": 6, "type": "elective", "prerequisites": (), "ects": 5, "block": "Valgfrie"},
+})
+
+# Column-wise (SoA) view of RECOMMENDED_CURRICULUM, aligned by position, for
+# vectorised lookups
+_N_COURSES = len(RECOMMENDED_CURRICULUM)
+COURSE_IDS = np.array(list(RECOMMENDED_CURRICULUM), dtype=object)
+SEMESTERS = np.fromiter(
+    (m["semester"] for m in RECOMMENDED_CURRICULUM.values()), dtype=np.int8, count=_N_COURSES
+)
 
 # Curriculum requirements
 CURRICULUM_REQUIREMENTS = {
@@ -124,9 +174,9 @@ CURRICULUM_REQUIREMENTS = {
 }
 
 # Course groups for validation
-COURSE_GROUPS = {
-    "STAT-CHOOSE-1": ["02402", "02403"],
-    "CHEM-CHOOSE-1": ["26020", "26021", "26022"],
-    "STS-CHOOSE-1": ["42620", "42622"],
-    "RSPEC-CHOOSE-5ECTS": ["02155", "02156", "02159"],
-}
+COURSE_GROUPS = MappingProxyType({
+    "STAT-CHOOSE-1": frozenset({"02402", "02403"}),
+    "CHEM-CHOOSE-1": frozenset({"26020", "26021", "26022"}),
+    "STS-CHOOSE-1": frozenset({"42620", "42622"}),
+    "RSPEC-CHOOSE-5ECTS": frozenset({"02155", "02156", "02159"}),
+})
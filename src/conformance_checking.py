@@ -1,32 +1,37 @@
+import importlib.util
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from typing import Dict
 
-from pm4py.objects.log.importer.xes import importer as xes_importer
-from pm4py.objects.petri_net.importer import importer as pnml_importer
-from pm4py.algo.conformance.tokenreplay import algorithm as token_replay
-from pm4py.algo.conformance.alignments.petri_net import algorithm as alignments
+import numpy as np
+import pandas as pd
+
+# pm4py modules are imported inside the functions that need them so that
+# importing this module (e.g. from main.py) stays cheap.
 
 try:
+    from .utils import ensure_dir, load_cached
     from .config import (
-        CONFORMANCE_PATH,
         CONFORMANCE_LOG_PATH,
+        CONFORMANCE_REPORT_PATH,
         IM_MODEL_PATH,
-        PERFORMANCE_PATH,
+        PERFORMANCE_GROUPS_PATH,
     )
 except ImportError:
+    from utils import ensure_dir, load_cached
     from config import (
-        CONFORMANCE_PATH,
         CONFORMANCE_LOG_PATH,
+        CONFORMANCE_REPORT_PATH,
         IM_MODEL_PATH,
-        PERFORMANCE_PATH,
+        PERFORMANCE_GROUPS_PATH,
     )
 
 
 # Defaults are config-driven so you can swap models without editing code
 REFERENCE_MODEL = IM_MODEL_PATH
-GROUP_LOG_DIR = os.path.join(PERFORMANCE_PATH, "groups")
-OUTPUT_REPORT = os.path.join(CONFORMANCE_PATH, "conformance_report.txt")
+GROUP_LOG_DIR = PERFORMANCE_GROUPS_PATH
+OUTPUT_REPORT = CONFORMANCE_REPORT_PATH
 
 # Limits to avoid runaway alignment runtime
 ALIGNMENT_MAX_TIME = 25    # seconds (global cap; aligns can explode)
@@ -40,9 +45,159 @@ GROUP_LOGS: Dict[str, str] = {
     "deviating_low_gpa": "deviating_low_gpa.xes",
 }
 
-def write(report_path, text):
-    with open(report_path, "a", encoding="utf-8") as f:
-        f.write(text + "\n")
+REPORT_BUFFER_SIZE = 1 << 16
+
+# Case column of logs read as DataFrames (XES trace attributes get "case:")
+CASE_ID_KEY = "case:concept:name"
+# Helper case key holding each case's position in the log; see alignment_fitness
+CASE_POSITION_KEY = "@@case_position"
+
+# Optional Rust XES parser; pm4py falls back to iterparse when it is missing
+HAS_RUSTXES = importlib.util.find_spec("rustxes") is not None
+
+
+def token_replay_fitness(log, net, im, fm):
+    from pm4py.algo.conformance.tokenreplay import algorithm as token_replay
+
+    results = token_replay.apply(log, net, im, fm)
+    fitness = np.fromiter(
+        (r["trace_fitness"] for r in results), dtype=np.float64, count=len(results)
+    )
+    if not fitness.size:
+        return ["Token Replay Fitness: no results"]
+
+    return [
+        f"Token Replay Fitness: avg={fitness.mean():.3f}, min={fitness.min():.3f}, max={fitness.max():.3f}",
+    ]
+
+
+def alignment_fitness(log, net, im, fm):
+    from pm4py.algo.conformance.alignments.petri_net import algorithm as alignments
+
+    params = {
+        alignments.Parameters.PARAM_MAX_ALIGN_TIME: ALIGNMENT_MAX_TIME,
+        alignments.Parameters.PARAM_MAX_ALIGN_TIME_TRACE: ALIGNMENT_MAX_TIME,
+        alignments.Parameters.SHOW_PROGRESS_BAR: False,
+    }
+    if isinstance(log, pd.DataFrame):
+        # pm4py groups DataFrame traces by (sorted) case id; key each case by
+        # its position in the log so trace#N in the report means the Nth trace
+        log = log.assign(**{CASE_POSITION_KEY: pd.factorize(log[CASE_ID_KEY])[0]})
+        params[alignments.Parameters.CASE_ID_KEY] = CASE_POSITION_KEY
+
+    try:
+        align_res = alignments.apply(log, net, im, fm, parameters=params)
+    except Exception as e:  # pragma: no cover - alignment can fail on unsound nets
+        return [f"Alignment failed: {e}"]
+
+    if not align_res:
+        return ["Alignment Fitness: no results (timeout or empty)"]
+
+    # Timed-out traces have no result; keep them as NaN so positions still
+    # match the log, and rank only the traces that were aligned
+    fitness_values = np.fromiter(
+        (
+            a["fitness"] if isinstance(a, dict) and "fitness" in a else np.nan
+            for a in align_res
+        ),
+        dtype=np.float64,
+        count=len(align_res),
+    )
+    aligned = np.flatnonzero(~np.isnan(fitness_values))
+    n = aligned.size
+    if not n:
+        return ["Alignment Fitness: no fitness values computed"]
+
+    values = fitness_values[aligned]
+    avg_fit = values.mean()
+    fit_count = np.count_nonzero(values >= 1 - FITNESS_FIT_EPS)
+    perc_fitting = 100 * fit_count / n
+
+    # One sort yields the worst traces as well as min and max
+    order = aligned[np.argsort(values, kind="stable")]
+    min_fit = fitness_values[order[0]]
+    max_fit = fitness_values[order[-1]]
+    worst_str = ", ".join(
+        [f"trace#{idx}: {fitness_values[idx]:.3f}" for idx in order[:3]]
+    )
+
+    return [
+        f"Alignment Fitness: avg={avg_fit:.3f}, min={min_fit:.3f}, max={max_fit:.3f}",
+        f"Percentage Fitting Traces: {perc_fitting:.1f}% (of {n} aligned)",
+        f"Timed-out traces: {len(align_res) - n}",
+        f"Worst traces (index:fitness): {worst_str}",
+    ]
+
+
+# Reference model (net, im, fm) of the current worker process; see _init_worker
+_NET = None
+
+
+def _init_worker(model_path):
+    """Load the reference Petri net once per worker process."""
+    global _NET
+    from pm4py.objects.petri_net.importer import importer as pnml_importer
+
+    _NET = load_cached(model_path, pnml_importer.apply)
+
+
+def check_group(group_name, log_path):
+    """
+    Conformance-check one group log and return its report lines.
+    Runs in a worker process: the XES is loaded here because pm4py objects
+    do not pickle cheaply, and the model comes from _init_worker.
+    """
+    from pm4py.objects.conversion.log import converter as log_converter
+    from pm4py.objects.log.importer.xes import importer as xes_importer
+
+    read_limit = ALIGNMENT_MAX_TRACES + 1
+    if HAS_RUSTXES:
+        # Rust parser reads the whole file but is still faster than iterparse
+        variant = xes_importer.Variants.RUSTXES
+        parameters = {variant.value.Parameters.RETURN_LEGACY_LOG_OBJECT: False}
+    else:
+        # Stop parsing one trace past the alignment cap: enough to know whether
+        # the log was truncated without reading the rest of the XML.
+        variant = xes_importer.Variants.ITERPARSE
+        parameters = {variant.value.Parameters.MAX_TRACES: read_limit}
+
+    def read_log(path):
+        # Token replay and alignments take a DataFrame directly, so keep the
+        # log in pandas; it also unpickles far faster than an EventLog.
+        log = xes_importer.apply(path, variant=variant, parameters=parameters)
+        if not isinstance(log, pd.DataFrame):
+            log = log_converter.apply(log, variant=log_converter.Variants.TO_DATA_FRAME)
+        return log
+
+    try:
+        log = load_cached(
+            log_path, read_log, tag=f"{variant.name}:max_traces={read_limit}:df"
+        )
+    except FileNotFoundError:
+        return [f"[{group_name}] XES not found → skipping\n"]
+    except Exception as e:  # pragma: no cover - PM4Py import errors
+        return [f"[{group_name}] Failed to import XES: {e}\n"]
+
+    cases = log[CASE_ID_KEY].unique() if len(log) else []
+    if len(cases) == 0:
+        return [f"[{group_name}] Log is empty → skipping\n"]
+
+    lines = []
+    if len(cases) > ALIGNMENT_MAX_TRACES:
+        cases = cases[:ALIGNMENT_MAX_TRACES]
+        log = log[log[CASE_ID_KEY].isin(cases)]
+        lines.append(
+            f"[{group_name}] Truncated log to first {ALIGNMENT_MAX_TRACES} traces for alignment runtime control"
+        )
+
+    net, im, fm = _NET
+
+    lines.append(f"--- {group_name.upper()} ---")
+    lines.append(f"Traces in log: {len(cases)}")
+    lines.extend(token_replay_fitness(log, net, im, fm))
+    lines.extend(alignment_fitness(log, net, im, fm))
+    lines.append("\n")
+    return lines
 
 
 class ConformanceChecker:
@@ -52,107 +207,72 @@ class ConformanceChecker:
         self.log_dir = log_dir
         self.report_file = report_file
 
-        os.makedirs(os.path.dirname(report_file), exist_ok=True)
-        with open(report_file, "w", encoding="utf-8") as f:
-            f.write(f"=== CONFORMANCE CHECK REPORT ({datetime.now()}) ===\n\n")
+        ensure_dir(os.path.dirname(report_file))
+        # One buffered handle for the whole run instead of reopening per line
+        self._report_fh = open(
+            report_file, "w", buffering=REPORT_BUFFER_SIZE, encoding="utf-8"
+        )
+        self._write(f"=== CONFORMANCE CHECK REPORT ({datetime.now()}) ===\n")
 
         if not os.path.exists(self.model_path):
+            self.close()
             raise FileNotFoundError(f"Model PNML not found: {self.model_path}")
 
-        self.net, self.im, self.fm = pnml_importer.apply(self.model_path)
-
-    def run(self):
-        for group_name, filename in self.group_logs.items():
-            log_path = os.path.join(self.log_dir, filename)
-
-            if not os.path.exists(log_path):
-                write(self.report_file, f"[{group_name}] XES not found → skipping\n")
-                continue
-
-            try:
-                log = xes_importer.apply(log_path)
-            except Exception as e:  # pragma: no cover - PM4Py import errors
-                write(self.report_file, f"[{group_name}] Failed to import XES: {e}\n")
-                continue
-
-            if len(log) == 0:
-                write(self.report_file, f"[{group_name}] Log is empty → skipping\n")
-                continue
-
-            if len(log) > ALIGNMENT_MAX_TRACES:
-                log = log[:ALIGNMENT_MAX_TRACES]
-                write(
-                    self.report_file,
-                    f"[{group_name}] Truncated log to first {ALIGNMENT_MAX_TRACES} traces for alignment runtime control",
-                )
-
-            write(self.report_file, f"--- {group_name.upper()} ---")
-            write(self.report_file, f"Traces in log: {len(log)}")
-
-            self.token_replay_fitness(log, group_name)
-            self.alignment_fitness(log, group_name)
-            write(self.report_file, "\n")
-
-    def token_replay_fitness(self, log, group):
-        results = token_replay.apply(log, self.net, self.im, self.fm)
-        fitness = [r["trace_fitness"] for r in results]
-        if not fitness:
-            write(self.report_file, "Token Replay Fitness: no results")
-            return
+        # Parse here so a broken model fails in the caller rather than in the
+        # pool initializer; this also warms the cache the workers unpickle
+        from pm4py.objects.petri_net.importer import importer as pnml_importer
 
-        avg_fit = sum(fitness) / len(fitness)
-        write(
-            self.report_file,
-            f"Token Replay Fitness: avg={avg_fit:.3f}, min={min(fitness):.3f}, max={max(fitness):.3f}",
-        )
+        try:
+            load_cached(self.model_path, pnml_importer.apply)
+        except Exception:
+            self.close()
+            raise
 
-    def alignment_fitness(self, log, group):
-        params = {
-            alignments.Parameters.PARAM_MAX_ALIGN_TIME: ALIGNMENT_MAX_TIME,
-            alignments.Parameters.PARAM_MAX_ALIGN_TIME_TRACE: ALIGNMENT_MAX_TIME,
-            alignments.Parameters.SHOW_PROGRESS_BAR: False,
-        }
+    def __enter__(self):
+        return self
 
-        try:
-            align_res = alignments.apply(log, self.net, self.im, self.fm, parameters=params)
-        except Exception as e:  # pragma: no cover - alignment can fail on unsound nets
-            write(self.report_file, f"Alignment failed: {e}")
-            return
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
-        if not align_res:
-            write(self.report_file, "Alignment Fitness: no results (timeout or empty)")
-            return
+    def close(self):
+        if not self._report_fh.closed:
+            self._report_fh.close()
 
-        valid_align = [a for a in align_res if isinstance(a, dict)]
-        fitness_values = [a.get("fitness") for a in valid_align if "fitness" in a]
+    def _write(self, text):
+        self._report_fh.write(text + "\n")
 
-        if not fitness_values:
-            write(self.report_file, "Alignment Fitness: no fitness values computed")
+    def run(self):
+        # Groups are independent, so each one is checked in its own process;
+        # results are written back in GROUP_LOGS order.
+        jobs = [
+            (group_name, os.path.join(self.log_dir, filename))
+            for group_name, filename in self.group_logs.items()
+        ]
+        if not jobs:
             return
 
-        avg_fit = sum(fitness_values) / len(fitness_values)
-        fit_count = sum(f >= (1 - FITNESS_FIT_EPS) for f in fitness_values)
-        perc_fitting = 100 * fit_count / len(fitness_values)
-
-        fitness_sorted = sorted(enumerate(fitness_values), key=lambda x: x[1])
-        worst_examples = fitness_sorted[: min(3, len(fitness_sorted))]
-        worst_str = ", ".join(
-            [f"trace#{idx}: {val:.3f}" for idx, val in worst_examples]
-        )
+        max_workers = min(len(jobs), os.cpu_count() or 1)
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(self.model_path,),
+        ) as pool:
+            futures = [
+                pool.submit(check_group, group_name, log_path)
+                for group_name, log_path in jobs
+            ]
+            for future in futures:
+                for line in future.result():
+                    self._write(line)
 
-        write(
-            self.report_file,
-            f"Alignment Fitness: avg={avg_fit:.3f}, min={min(fitness_values):.3f}, max={max(fitness_values):.3f}",
-        )
-        write(self.report_file, f"Percentage Fitting Traces: {perc_fitting:.1f}%")
-        write(self.report_file, f"Worst traces (index:fitness): {worst_str}")
+        self._report_fh.flush()
 
 
 if __name__ == "__main__":
-    checker = ConformanceChecker(
+    with ConformanceChecker(
         model_path=REFERENCE_MODEL,
         group_logs=GROUP_LOGS,
         log_dir=GROUP_LOG_DIR,
         report_file=OUTPUT_REPORT,
-    )
-    checker.run()
+    ) as checker:
+        checker.run()
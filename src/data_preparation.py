@@ -1,6 +1,7 @@
+import importlib.util
 import os
 import re
-from typing import Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 
 import numpy as np
@@ -12,7 +13,7 @@ from pm4py.objects.log.exporter.xes import exporter as xes_exporter
 
 try:
     # Prefer package-relative imports when run with -m
-    from .utils import Utils as util
+    from .utils import Utils as util, load_cached, ensure_dir
     from .config import (
         DATA_PATH,
         RAW_DATA_PATH,
@@ -23,7 +24,7 @@ try:
     )
 except ImportError:
     # Fallback for direct execution without -m
-    from utils import Utils as util
+    from utils import Utils as util, load_cached, ensure_dir
     from config import (
         DATA_PATH,
         RAW_DATA_PATH,
@@ -33,6 +34,26 @@ except ImportError:
         XES_OUTPUT_PATH,
     )
 
+# Rust-backed xlsx reader (pandas >= 2.2); openpyxl is the pure-Python fallback
+EXCEL_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else "openpyxl"
+
+# Danish letters in the (upper-cased) raw headers
+_HEADER_TRANSLATION = str.maketrans({"Ø": "O", "Æ": "AE", "Å": "A"})
+
+# Semester labels such as "Spring 2021"; the bare year is the fallback
+_SEMESTER_RE = re.compile(r"(Spring|Autumn)\s+([12]\d{3})", re.IGNORECASE)
+_YEAR_RE = re.compile(r"([12]\d{3})")
+
+# Few distinct values repeated on every row; stored dictionary-encoded
+CATEGORICAL_COLUMNS = (
+    "student_id",
+    "education",
+    "course_code",
+    "scale",
+    "exam_type",
+    "examiner",
+)
+
 
 class DataPreparer:
     """
@@ -63,20 +84,25 @@ class DataPreparer:
 
         self.df: Optional[pd.DataFrame] = None
         self.df_sample: Optional[pd.DataFrame] = None
+        self.event_log = None  # pm4py EventLog, kept for in-process consumers
 
-        os.makedirs(DATA_PATH, exist_ok=True)
+        ensure_dir(DATA_PATH)
         self.log_path = os.path.join(DATA_PATH, "data_preparation_log.txt")
+        self._log_buf: List[Tuple[str, str]] = []
         self._init_log()
 
     def run(self) -> None:
-        self._load_raw_data()
-        self._clean_and_format()
-        self._assign_semesters()
-        self._sort_chronologically()
-        self._classify_passes()
-        self._assign_attempt_numbers()
-        self._save_outputs()
-        self._convert_to_event_log()
+        try:
+            self._load_raw_data()
+            self._clean_and_format()
+            self._assign_semesters()
+            self._sort_chronologically()
+            self._classify_passes()
+            self._assign_attempt_numbers()
+            self._save_outputs()
+            self._convert_to_event_log()
+        finally:
+            self._flush_log()
 
     def _init_log(self) -> None:
         with open(self.log_path, "w") as f:
@@ -86,17 +112,25 @@ class DataPreparer:
             )
 
     def _log(self, title: str, content: str) -> None:
+        # Buffered; written in one go by _flush_log at the end of run()
+        self._log_buf.append((title, content))
+
+    def _flush_log(self) -> None:
+        if not self._log_buf:
+            return
         with open(self.log_path, "a") as f:
-            f.write(f"--- {title.upper()} ---\n")
-            f.write(content.strip() + "\n\n")
+            f.write(
+                "".join(
+                    "".join(("--- ", title.upper(), " ---\n", content.strip(), "\n\n"))
+                    for title, content in self._log_buf
+                )
+            )
+        self._log_buf.clear()
 
     def _load_raw_data(self) -> None:
         if not os.path.exists(self.raw_path):
             raise FileNotFoundError(f"Raw data file not found at {self.raw_path}")
 
-        df = pd.read_excel(self.raw_path, header=1, dtype=str)
-        original_rows, original_cols = df.shape
-
         rename_map = {
             "STUDIENR": "student_id",
             "UDDANNELSE": "education",
@@ -110,13 +144,26 @@ class DataPreparer:
             "BEDOMMELSESDATO": "grade_date",
         }
 
-        df.columns = (
-            df.columns.str.strip()
-            .str.upper()
-            .str.replace("Ø", "O")
-            .str.replace("Æ", "AE")
-            .str.replace("Å", "A")
+        def normalize(name) -> str:
+            return str(name).strip().upper().translate(_HEADER_TRANSLATION)
+
+        # Only cells of the mapped columns are parsed. Parsing the workbook
+        # dominates startup, so the frame is reused until the .xlsx changes
+        # (see utils.load_cached).
+        df = load_cached(
+            self.raw_path,
+            lambda path: pd.read_excel(
+                path,
+                header=1,
+                dtype=object,
+                engine=EXCEL_ENGINE,
+                usecols=lambda name: normalize(name) in rename_map,
+            ),
+            tag=f"read_excel:header=1:dtype=object:engine={EXCEL_ENGINE}:usecols={sorted(rename_map)}",
         )
+        original_rows, original_cols = df.shape
+
+        df.columns = [normalize(c) for c in df.columns]
         df = df.rename(columns=rename_map)
 
         missing_cols = [c for c in rename_map.values() if c not in df.columns]
@@ -125,9 +172,14 @@ class DataPreparer:
 
         df = df[[c for c in rename_map.values() if c in df.columns]]
 
+        # Everything is text except grade_date, whose Excel date cells are
+        # kept as datetimes so _clean_and_format need not parse them back
+        text_cols = df.columns.drop("grade_date", errors="ignore")
+        df = df.astype(dict.fromkeys(text_cols, str)).where(df.notna())
+
         summary = (
             f"Raw rows: {original_rows}\n"
-            f"Raw columns: {original_cols}\n"
+            f"Raw columns read: {original_cols}\n"
             f"Columns after renaming and selection: {list(df.columns)}"
         )
         self._log("Load Raw Data", summary)
@@ -144,16 +196,19 @@ class DataPreparer:
         # ECTS numeric
         df["ects"] = pd.to_numeric(
             df["ects"].str.replace(",", ".", regex=False), errors="coerce"
-        )
+        ).astype(np.float32)
 
         # Normalize course codes (add leading 0 for 4-digit numeric codes)
-        df["course_code"] = df["course_code"].apply(
-            lambda x: f"0{x}"
-            if isinstance(x, str) and len(x) == 4 and x.isdigit()
-            else x
-        )
+        codes = df["course_code"].astype(str)
+        short = (codes.str.len() == 4) & codes.str.isdigit()
+        df.loc[short, "course_code"] = "0" + codes[short]
+
+        for col in CATEGORICAL_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype("category")
 
-        # Parse dates
+        # Parse dates; Excel date cells are converted directly and only the
+        # cells typed as text go through string parsing
         df["grade_date"] = pd.to_datetime(df["grade_date"], errors="coerce")
 
         # Filter by program if requested
@@ -178,22 +233,16 @@ class DataPreparer:
         self.df = df
 
     def _assign_semesters(self) -> None:
-        def semester_from_date(ts: pd.Timestamp) -> str:
-            if pd.isna(ts):
-                return "Unknown"
-            y, m = ts.year, ts.month
-            # Spring: Feb–Jul
-            if m in (2, 3, 4, 5, 6, 7):
-                return f"Spring {y}"
-            # Autumn: Aug–Jan (Jan belongs to previous autumn)
-            if m in (8, 9, 10, 11, 12):
-                return f"Autumn {y}"
-            if m == 1:
-                return f"Autumn {y - 1}"
-            return "Unknown"
-
         df = self.df
-        df["Semester"] = df["grade_date"].apply(semester_from_date)
+
+        dates = df["grade_date"]
+        month = dates.dt.month
+        # Spring: Feb–Jul; Autumn: Aug–Jan (Jan belongs to previous autumn)
+        season = pd.Series(
+            np.where(month.between(2, 7), "Spring ", "Autumn "), index=df.index
+        )
+        sem_year = dates.dt.year.where(month != 1, dates.dt.year - 1).astype("Int64")
+        df["Semester"] = (season + sem_year.astype(str)).where(dates.notna(), "Unknown")
 
         unknown_count = (df["Semester"] == "Unknown").sum()
         summary = (
@@ -206,33 +255,37 @@ class DataPreparer:
         self.df = df
 
     def _sort_chronologically(self) -> None:
-        def semester_sort_key(sem_text: str):
-            season_order = {"Spring": 1, "Autumn": 2, "Unknown": 99}
-            if not isinstance(sem_text, str) or not sem_text.strip():
-                return 9999, 99
-            m = re.search(r"(Spring|Autumn)\s+([12]\d{3})", sem_text, flags=re.IGNORECASE)
-            if m:
-                season = m.group(1).capitalize()
-                year = int(m.group(2))
-                return year, season_order.get(season, 50)
-            m = re.search(r"([12]\d{3})", sem_text)
-            if m:
-                return int(m.group(1)), 50
-            return 9999, 99
-
-        def row_sort_key(row):
-            dt = row["grade_date"]
-            if pd.notna(dt):
-                return dt.year, dt.month, 0
-            y, o = semester_sort_key(row["Semester"])
-            return y, o, 1
-
         df = self.df
-        df = (
-            df.assign(_key=df.apply(row_sort_key, axis=1))
-            .sort_values("_key")
-            .drop(columns=["_key"])
+
+        # Rows with a date sort by (year, month) and then by the date itself,
+        # so the exported traces are in true chronological order; rows without
+        # one fall back to the Semester text and are placed after dated rows of
+        # the same period.
+        dates = df["grade_date"]
+        has_date = dates.notna()
+
+        sem = df["Semester"].fillna("").astype(str)
+        season_match = sem.str.extract(_SEMESTER_RE)
+        year_only = sem.str.extract(_YEAR_RE, expand=False)
+
+        fallback_year = pd.to_numeric(season_match[1].fillna(year_only)).fillna(9999)
+        fallback_order = (
+            season_match[0].str.capitalize().map({"Spring": 1, "Autumn": 2})
+            .fillna(pd.Series(np.where(year_only.notna(), 50, 99), index=df.index))
+        )
+
+        keys = pd.DataFrame(
+            {
+                "year": np.where(has_date, dates.dt.year, fallback_year).astype(np.int64),
+                "order": np.where(has_date, dates.dt.month, fallback_order).astype(np.int64),
+                "undated": (~has_date).astype(np.int8),
+                "date": dates,
+            },
+            index=df.index,
         )
+        df = df.loc[
+            keys.sort_values(["year", "order", "undated", "date"], kind="mergesort").index
+        ]
 
         self._log(
             "Sort Chronologically",
@@ -244,61 +297,47 @@ class DataPreparer:
     def _classify_passes(self) -> None:
         df = self.df
 
-        def normalize_text(x):
-            return "" if pd.isna(x) else str(x).strip()
-
-        def classify_pass(row):
-            scale = normalize_text(row.get("scale", "")).casefold()
-            grade_raw = normalize_text(row.get("grade", ""))
-            grade = grade_raw.casefold()
-
-            non_pass_tokens = {"ib", "ikke bestået", "ig", "em", "im"}
-            sick_tokens = {"s", "syg"}
-
-            # Drop sick here by returning a marker
-            if grade in sick_tokens:
-                return "SICK", np.nan
-
-            # Pass/fail scale (e.g., "Bestået/Ikke Bestået")
-            if "bestået" in scale:
-                if grade.startswith("be") or grade == "bestået":
-                    return True, np.nan
-                if grade in non_pass_tokens:
-                    return False, np.nan
-                # Try numeric fallback if weird combos
-                try:
-                    gnum = float(grade.replace(",", "."))
-                    return gnum >= 2.0, gnum
-                except ValueError:
-                    return np.nan, np.nan
-
-            # 7-trinsskala
-            if "7" in scale:
-                if grade in non_pass_tokens:
-                    return False, np.nan
-                try:
-                    gnum = float(grade.replace(",", "."))
-                    return gnum >= 2.0, gnum
-                except ValueError:
-                    if grade.startswith("be"):
-                        return True, np.nan
-                    return np.nan, np.nan
-
-            return np.nan, np.nan
-
-        results = df.apply(lambda r: classify_pass(r), axis=1)
-        df["pass_flag"] = results.apply(lambda x: x[0])
-        df["grade_num"] = results.apply(lambda x: x[1])
+        def normalized(col: str) -> pd.Series:
+            if col not in df.columns:
+                return pd.Series("", index=df.index)
+            # .str on a categorical works per category; fill afterwards since
+            # "" is not one of its categories
+            return df[col].str.strip().str.casefold().fillna("")
+
+        scale = normalized("scale")
+        grade = normalized("grade")
+
+        non_pass_tokens = ["ib", "ikke bestået", "ig", "em", "im"]
+        sick_tokens = ["s", "syg"]
+
+        is_sick = grade.isin(sick_tokens)
+        non_pass = grade.isin(non_pass_tokens)
+        starts_be = grade.str.startswith("be")
+        gnum = pd.to_numeric(grade.str.replace(",", ".", regex=False), errors="coerce")
+
+        # Pass/fail scale (e.g., "Bestået/Ikke Bestået") takes precedence over 7-trinsskala
+        pass_fail_scale = scale.str.contains("bestået", regex=False)
+        seven_scale = ~pass_fail_scale & scale.str.contains("7", regex=False)
+        graded = pass_fail_scale | seven_scale
+        # Numeric grades (also the fallback for weird combos on the pass/fail scale)
+        numeric = graded & ~non_pass & gnum.notna()
+
+        # Assigned from lowest to highest precedence; rows left untouched stay <NA>.
+        # Nullable boolean rather than object keeps later comparisons vectorised.
+        passed = pd.Series(pd.NA, index=df.index, dtype="boolean")
+        passed[graded & non_pass] = False
+        passed[numeric] = gnum[numeric] >= 2.0
+        passed[seven_scale & ~numeric & starts_be] = True
+        passed[pass_fail_scale & starts_be] = True
+
+        df["grade_num"] = gnum.where(numeric).astype(np.float32)
+        df["passed"] = passed
 
         # Remove sick exam attempts
         before = len(df)
-        df = df[df["pass_flag"] != "SICK"].copy()
+        df = df[~is_sick].copy()
         after = len(df)
 
-        # Rename pass_flag to passed (bool / NaN)
-        df["passed"] = df["pass_flag"].where(df["pass_flag"].isin([True, False]), np.nan)
-        df = df.drop(columns=["pass_flag"])
-
         summary = (
             f"Rows before removing sick: {before}\n"
             f"Rows after removing sick:  {after}\n"
@@ -311,12 +350,13 @@ class DataPreparer:
     def _assign_attempt_numbers(self) -> None:
         df = self.df
 
-        df = df.sort_values(["student_id", "course_code", "grade_date"])
+        # Rank attempts by date within each (student, course) instead of
+        # re-sorting the frame; rows keep the chronological order from
+        # _sort_chronologically and ties fall back to that order.
         df["attempt_no"] = (
-            df.groupby(["student_id", "course_code"])
-            .cumcount()
-            .astype(int)
-            + 1
+            df.groupby(["student_id", "course_code"], sort=False, observed=True)["grade_date"]
+            .rank(method="first", na_option="bottom")
+            .astype(np.int16)
         )
 
         summary = (
@@ -330,23 +370,26 @@ class DataPreparer:
     def _save_outputs(self) -> None:
         df = self.df
 
+        # Sample student codes rather than ids: membership is then an integer
+        # lookup. sort=True keeps the seeded sample independent of row order.
+        # The factorization also gives the student count for the log below.
+        codes, unique_students = pd.factorize(df["student_id"], sort=True)
+        n_students = len(unique_students)
+
         df.to_csv(self.processed_path, index=False)
         self._log(
             "Save Processed Data",
             f"Processed data saved to {self.processed_path}\n"
             f"Rows: {len(df)}\n"
-            f"Students: {df['student_id'].nunique()}",
+            f"Students: {n_students}",
         )
 
-        unique_students = df["student_id"].unique()
-        n_students = len(unique_students)
-        np.random.seed(42)
         sample_size = max(1, int(n_students * self.sample_fraction))
 
-        sampled_students = np.random.choice(
-            unique_students, size=sample_size, replace=False
-        )
-        df_sample = df[df["student_id"].isin(sampled_students)].copy()
+        rng = np.random.default_rng(42)
+        sampled = np.zeros(n_students, dtype=bool)
+        sampled[rng.choice(n_students, size=sample_size, replace=False)] = True
+        df_sample = df[sampled[codes]]
 
         df_sample.to_csv(self.sampled_path, index=False)
         self._log(
@@ -361,19 +404,7 @@ class DataPreparer:
         self.df_sample = df_sample
 
     def _convert_to_event_log(self) -> None:
-        df_log = self.df_sample.copy()
-
-        # Ensure timestamps are proper datetime
-        df_log = dataframe_utils.convert_timestamp_columns_in_df(df_log)
-
-        # Rename columns for PM4Py
-        df_log = df_log.rename(
-            columns={
-                "student_id": "case:concept:name",
-                "course_code": "concept:name",
-                "grade_date": "time:timestamp",
-            }
-        )
+        df_sample = self.df_sample
 
         event_attributes = [
             "grade",
@@ -385,24 +416,45 @@ class DataPreparer:
             "exam_type",
             "education",
         ]
-        event_attributes = [c for c in event_attributes if c in df_log.columns]
+        event_attributes = [c for c in event_attributes if c in df_sample.columns]
+
+        # Project first so the timestamp scan below only sees exported columns
+        df_log = df_sample[["student_id", "grade_date", "course_code"] + event_attributes].copy()
+
+        # grade_date is already datetime64 (see _clean_and_format); restrict
+        # pm4py's conversion to it so the other object columns are not
+        # trial-parsed as timestamps. It still applies pm4py's timezone policy.
+        df_log = dataframe_utils.convert_timestamp_columns_in_df(
+            df_log, timest_columns=["grade_date"]
+        )
+
+        # Rename columns for PM4Py
+        df_log = df_log.rename(
+            columns={
+                "student_id": "case:concept:name",
+                "course_code": "concept:name",
+                "grade_date": "time:timestamp",
+            }
+        )
 
         parameters = {
             log_converter.Variants.TO_EVENT_LOG.value.Parameters.CASE_ID_KEY: "case:concept:name"
         }
 
         event_log = log_converter.apply(
-            df_log[["case:concept:name", "time:timestamp", "concept:name"] + event_attributes],
+            df_log,
             parameters=parameters,
             variant=log_converter.Variants.TO_EVENT_LOG,
         )
 
         xes_exporter.apply(event_log, self.xes_path)
+        self.event_log = event_log
 
         summary = (
             f"Event log exported to {self.xes_path}\n"
             f"Cases (students): {len(event_log)}\n"
-            f"Total events:     {sum(len(t) for t in event_log)}"
+            # One event per row, so no need to walk the traces to count them
+            f"Total events:     {len(df_log)}"
         )
         self._log("Convert to Event Log", summary)
 
@@ -1,16 +1,31 @@
 from src.utils import Utils
 from src.data_preparation import DataPreparer
 from src.process_discovery import ProcessDiscovery
-from src.performance_analysis import PerformanceAnalyzer
-from src.conformance_checking import ConformanceChecker
+from src.performance_analysis import PerformanceAnalysis
+from src.conformance_checking import (
+    ConformanceChecker,
+    REFERENCE_MODEL,
+    GROUP_LOGS,
+    GROUP_LOG_DIR,
+    OUTPUT_REPORT,
+)
 
 
 def main():
     Utils().run()
-    DataPreparer().run()
-    ProcessDiscovery().run()
-    PerformanceAnalyzer().run()
-    ConformanceChecker().run()
+    preparer = DataPreparer()
+    preparer.run()
+    # Reuse the log DataPreparer just exported instead of re-parsing the XES
+    ProcessDiscovery(event_log=preparer.event_log).run()
+    # Hand the processed frame over directly instead of re-reading the CSV
+    PerformanceAnalysis(processed_df=preparer.df).run()
+    with ConformanceChecker(
+        model_path=REFERENCE_MODEL,
+        group_logs=GROUP_LOGS,
+        log_dir=GROUP_LOG_DIR,
+        report_file=OUTPUT_REPORT,
+    ) as checker:
+        checker.run()
 
 
 if __name__ == "__main__":
@@ -1,5 +1,5 @@
 import os
-from typing import Optional, Dict
+from typing import List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -12,21 +12,23 @@ from pm4py.visualization.petri_net import visualizer as pn_visualizer
 
 try:
     # Prefer package-relative imports when run with -m
-    from .utils import Utils as util
+    from .utils import Utils as util, ensure_dir, load_cached
     from .config import (
         PROCESSED_DATA_PATH,
         PERFORMANCE_PATH,
         PERFORMANCE_LOG_PATH,
-        RECOMMENDED_CURRICULUM,
+        COURSE_IDS,
+        SEMESTERS,
     )
 except ImportError:
     # Fallback for direct execution without -m
-    from utils import Utils as util
+    from utils import Utils as util, ensure_dir, load_cached
     from config import (
         PROCESSED_DATA_PATH,
         PERFORMANCE_PATH,
         PERFORMANCE_LOG_PATH,
-        RECOMMENDED_CURRICULUM,
+        COURSE_IDS,
+        SEMESTERS,
     )
 
 # Graphviz: allow override via env; keep Windows portable fallback for that OS only
@@ -37,6 +39,9 @@ elif os.name == "nt":
     portable_bin = r"C:\Users\deniz\Desktop\Code\CurriculumOptimizationPM02269\graphviz_portable\release\bin"
     os.environ["PATH"] = portable_bin + os.pathsep + os.environ["PATH"]
 
+# Recommended semester per curriculum course code, for vectorised lookups
+_REC_SEMESTER = pd.Series(SEMESTERS.astype(np.float64), index=COURSE_IDS)
+
 
 class PerformanceAnalysis:
     """
@@ -63,8 +68,11 @@ class PerformanceAnalysis:
         restrict_to_curriculum: bool = True,
         min_activity_freq: int = 5,
         max_program_semester_for_model: int = 4,
+        processed_df: Optional[pd.DataFrame] = None,
     ):
         self.processed_path = processed_path
+        # In-process hand-off from DataPreparer.df; skips re-reading the CSV
+        self.processed_df = processed_df
         self.results_dir = results_dir
         self.gpa_high = gpa_high
         self.gpa_low = gpa_low
@@ -80,9 +88,9 @@ class PerformanceAnalysis:
         self.group_dir = os.path.join(self.results_dir, "groups")
         self.showcase_dir = os.path.join(self.results_dir, "showcase")
 
-        os.makedirs(self.results_dir, exist_ok=True)
-        os.makedirs(self.group_dir, exist_ok=True)
-        os.makedirs(self.showcase_dir, exist_ok=True)
+        # Both leaves live under results_dir, so this also creates it
+        ensure_dir(self.group_dir)
+        ensure_dir(self.showcase_dir)
 
         # Dataframes
         self.df: Optional[pd.DataFrame] = None          # event-level
@@ -91,6 +99,8 @@ class PerformanceAnalysis:
         # RNG
         self.rng = np.random.RandomState(self.random_seed)
 
+        self._log_buf: List[Tuple[str, str]] = []
+
         # init log
         with open(PERFORMANCE_LOG_PATH, "w", encoding="utf-8", errors="replace") as f:
             f.write("=== PERFORMANCE ANALYSIS LOG ===\n\n")
@@ -100,26 +110,69 @@ class PerformanceAnalysis:
     # ------------------------------------------------------------------ #
 
     def run(self) -> None:
-        self._load()
-        self._compute_gpa()
-        self._compute_curriculum_adherence()
-        self._build_student_table()
-        self._export_groups_and_models()
+        try:
+            self._load()
+            self._compute_gpa()
+            self._compute_curriculum_adherence()
+            self._build_student_table()
+            self._export_groups_and_models()
+        finally:
+            self._flush_log()
 
     # ------------------------------------------------------------------ #
     # Internal helpers
     # ------------------------------------------------------------------ #
 
     def _log(self, title: str, content: str) -> None:
+        # Buffered; written in one go by _flush_log at the end of run()
+        self._log_buf.append((title, content))
+
+    def _flush_log(self) -> None:
+        if not self._log_buf:
+            return
         with open(PERFORMANCE_LOG_PATH, "a", encoding="utf-8", errors="replace") as f:
-            f.write(f"--- {title.upper()} ---\n")
-            f.write(content.strip() + "\n\n")
+            f.write(
+                "".join(
+                    "".join(("--- ", title.upper(), " ---\n", content.strip(), "\n\n"))
+                    for title, content in self._log_buf
+                )
+            )
+        self._log_buf.clear()
 
     def _load(self) -> None:
-        if not os.path.exists(self.processed_path):
-            raise FileNotFoundError(f"Missing processed CSV: {self.processed_path}")
-
-        df = pd.read_csv(self.processed_path)
+        if self.processed_df is not None:
+            # Widen DataPreparer's compact dtypes to what read_csv would give,
+            # so both entry points export the same group XES
+            df = self.processed_df.reset_index(drop=True)
+            cat_cols = df.select_dtypes("category").columns
+            df[cat_cols] = df[cat_cols].astype(object)
+            f32_cols = df.select_dtypes(np.float32).columns
+            df[f32_cols] = df[f32_cols].astype(np.float64)
+            int_cols = df.select_dtypes(np.integer).columns
+            df[int_cols] = df[int_cols].astype(np.int64)
+            for col in df.select_dtypes("boolean").columns:
+                if df[col].isna().any():
+                    # read_csv reads a column with gaps as object True/False/NaN
+                    df[col] = df[col].astype(object).where(df[col].notna(), np.nan)
+                else:
+                    df[col] = df[col].astype(bool)
+        else:
+            if not os.path.exists(self.processed_path):
+                raise FileNotFoundError(f"Missing processed CSV: {self.processed_path}")
+
+            # Pin the identifier columns to text: skips type inference and keeps
+            # course codes zero-padded ("02104") for the curriculum lookup.
+            # Every column is kept because the extras end up in the group XES.
+            # Repeated runs on an unchanged CSV load the pickled frame instead
+            # (see utils.load_cached).
+            df = load_cached(
+                self.processed_path,
+                lambda path: pd.read_csv(
+                    path,
+                    dtype={"student_id": str, "course_code": str, "Semester": str},
+                ),
+                tag="dtype=student_id,course_code,Semester:str",
+            )
 
         # Ensure key columns exist
         for col in ["student_id", "course_code", "grade_num", "Semester"]:
@@ -136,45 +189,46 @@ class PerformanceAnalysis:
             df = df.sort_values(["student_id", "Semester"])
 
         self.df = df
+        # Hash the ids once; later sections only report the same count
+        self._n_students = df["student_id"].nunique()
 
         self._log(
             "Load processed data",
-            f"Rows: {len(df)}\nUnique students: {df['student_id'].nunique()}",
+            f"Rows: {len(df)}\nUnique students: {self._n_students}",
         )
 
     def _compute_gpa(self) -> None:
         df = self.df
-        gpa = df.groupby("student_id")["grade_num"].mean().rename("gpa")
-        self.df = df.merge(gpa, on="student_id", how="left")
+        # Broadcast the per-student mean in place instead of merging it back
+        df["gpa"] = df.groupby("student_id", sort=False)["grade_num"].transform("mean")
+        gpa = df["gpa"]
 
         self._log(
             "Compute GPA",
-            f"GPA computed for {gpa.shape[0]} students\n"
+            f"GPA computed for {self._n_students} students\n"
             f"GPA range: {gpa.min():.2f} – {gpa.max():.2f}",
         )
 
     def _compute_curriculum_adherence(self) -> None:
         df = self.df
 
-        def assign_program_semesters(group: pd.DataFrame) -> pd.DataFrame:
-            codes, uniques = pd.factorize(group["Semester"], sort=False)
-            group = group.copy()
-            group["program_semester"] = codes + 1
-            return group
-
-        df = (
-            df.sort_values(["student_id", "grade_date"])
-            .groupby("student_id", group_keys=False)
-            .apply(assign_program_semesters)
+        df = df.sort_values(["student_id", "grade_date"])
+
+        # Program semester = order in which a student's semesters first appear:
+        # count first occurrences per student, then give every row of a
+        # (student, Semester) pair the count at its first occurrence. Rows
+        # without a Semester get 0, as pd.factorize's -1 code + 1 did.
+        has_semester = df["Semester"].notna()
+        first_seen = has_semester & ~df.duplicated(["student_id", "Semester"])
+        seen_so_far = first_seen.groupby(df["student_id"], sort=False).cumsum()
+        df["program_semester"] = (
+            seen_so_far.groupby([df["student_id"], df["Semester"]], sort=False)
+            .transform("first")
+            .where(has_semester, 0)
+            .astype(np.int64)
         )
 
-        def get_rec_semester(course_code: str) -> float:
-            info: Dict = RECOMMENDED_CURRICULUM.get(str(course_code), None)
-            if info is None:
-                return np.nan
-            return float(info.get("semester", np.nan))
-
-        df["rec_semester"] = df["course_code"].astype(str).apply(get_rec_semester)
+        df["rec_semester"] = df["course_code"].astype(str).map(_REC_SEMESTER)
         df["sem_deviation"] = df["program_semester"] - df["rec_semester"]
         df["sem_deviation_abs"] = df["sem_deviation"].abs()
         df["on_time"] = df["sem_deviation_abs"] <= float(self.adherence_tolerance)
@@ -185,27 +239,27 @@ class PerformanceAnalysis:
         self._log(
             "Curriculum adherence",
             f"Rows with known recommended semester: {known}/{len(df)}\n"
-            f"Mean abs deviation: {df['sem_deviation_abs'].dropna().mean():.3f}",
+            f"Mean abs deviation: {df['sem_deviation_abs'].mean():.3f}",
         )
 
     def _build_student_table(self) -> None:
         df = self.df
 
-        def failed_count(s):
-            return int((s == False).sum())
+        # Failed attempts as a bool mask (NaN compares unequal to False), so
+        # the count is a C-level sum
+        is_fail = (df["passed"] == False) if "passed" in df.columns else False
 
-        student_stats = df.groupby("student_id").agg(
+        student_stats = df.assign(_is_fail=is_fail).groupby("student_id").agg(
             gpa=("gpa", "first"),
             n_events=("course_code", "size"),
-            n_courses=("course_code", pd.Series.nunique),
+            n_courses=("course_code", "nunique"),
             ects_total=("ects", "sum"),
-            n_failures=("passed", failed_count)
-            if "passed" in df.columns else ("grade_num", lambda s: 0),
+            n_failures=("_is_fail", "sum"),
             max_semester=("program_semester", "max"),
-            # adherence_score and on_time_ratio are % on-time (0–1)
+            # % on-time (0–1); also reported as adherence_score below
             on_time_ratio=("on_time", "mean"),
-            adherence_score=("on_time", "mean"),
         )
+        student_stats["adherence_score"] = student_stats["on_time_ratio"]
 
         student_stats["adherent"] = (
             student_stats["on_time_ratio"] >= self.min_on_time_ratio
@@ -231,11 +285,17 @@ class PerformanceAnalysis:
     def _export_groups_and_models(self) -> None:
         students = self.students
 
+        # Each base mask is built once and combined, not rescanned per group
+        adherent = students["adherent"] == True
+        deviating = students["adherent"] == False
+        high_gpa = students["gpa"] >= self.gpa_high
+        low_gpa = students["gpa"] <= self.gpa_low
+
         groups = {
-            "adherent_high_gpa": (students["adherent"] == True) & (students["gpa"] >= self.gpa_high),
-            "adherent_low_gpa": (students["adherent"] == True) & (students["gpa"] <= self.gpa_low),
-            "deviating_high_gpa": (students["adherent"] == False) & (students["gpa"] >= self.gpa_high),
-            "deviating_low_gpa": (students["adherent"] == False) & (students["gpa"] <= self.gpa_low),
+            "adherent_high_gpa": adherent & high_gpa,
+            "adherent_low_gpa": adherent & low_gpa,
+            "deviating_high_gpa": deviating & high_gpa,
+            "deviating_low_gpa": deviating & low_gpa,
         }
 
         for name, mask in groups.items():
@@ -254,7 +314,8 @@ class PerformanceAnalysis:
             else:
                 sampled_ids = student_ids
 
-            group_events = self.df[self.df["student_id"].isin(sampled_ids)].copy()
+            # No copy: _export_filtered_model only filters and renames it
+            group_events = self.df[self.df["student_id"].isin(sampled_ids)]
 
             # student summary
             group_students_csv = os.path.join(self.group_dir, f"{name}_students.csv")
@@ -291,9 +352,11 @@ class PerformanceAnalysis:
 
         # 1) curriculum filter
         if self.restrict_to_curriculum:
-            valid = set(RECOMMENDED_CURRICULUM.keys())
+            # Every curriculum course has a recommended semester, so the
+            # rec_semester lookup from _compute_curriculum_adherence doubles
+            # as the membership test (no second string hash per row)
             before = len(df_sub)
-            df_sub = df_sub[df_sub["course_code"].astype(str).isin(valid)]
+            df_sub = df_sub[df_sub["rec_semester"].notna()]
             after = len(df_sub)
             log_lines.append(f"Curriculum filter: {before} -> {after}")
 
@@ -320,16 +383,16 @@ class PerformanceAnalysis:
         )
 
         # 4) drop too-small traces
-        df_sub = df_sub.groupby("student_id").filter(lambda g: len(g) >= 3)
+        trace_len = df_sub.groupby("student_id", sort=False)["student_id"].transform("size")
+        df_sub = df_sub[trace_len >= 3]
         if df_sub.empty:
             log_lines.append("All traces too small; skipping.")
             self._log(name, "\n".join(log_lines))
             return
 
         # ------------ build PM4Py log ------------
-        df_log = df_sub.copy()
-
-        df_log = df_log.rename(
+        # rename() already returns a new frame, so no defensive copy first
+        df_log = df_sub.rename(
             columns={
                 "student_id": "case:concept:name",
                 "course_code": "concept:name",
@@ -371,7 +434,7 @@ class PerformanceAnalysis:
 
         log_lines.append(
             f"Cases: {len(event_log)}\n"
-            f"Total events: {sum(len(t) for t in event_log)}\n"
+            f"Total events: {len(df_log)}\n"
             f"XES saved: {xes_path}\n"
             f"PNML saved: {pnml_path}\n"
             f"PNG saved: {png_path}"
@@ -1,36 +1,54 @@
+import importlib.util
 import os
 import shutil
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 
 from pm4py import (
+    convert_to_petri_net,
     discover_petri_net_alpha,
     discover_petri_net_inductive,
     discover_process_tree_inductive,
 )
-from pm4py.algo.discovery.heuristics.algorithm import apply as discover_heuristics_net
+from pm4py.algo.discovery.inductive import algorithm as inductive_miner
+from pm4py.algo.discovery.heuristics.variants.classic import apply_heu_dfg
+from pm4py.objects.conversion.heuristics_net import converter as hn_converter
 from pm4py.objects.log.obj import EventLog, Trace, Event
 from pm4py.objects.petri_net.exporter import exporter as pnml_exporter
 from pm4py import discover_petri_net_inductive
 from pm4py.statistics.traces.generic.log import case_statistics
 from pm4py.objects.log.importer.xes import importer as xes_importer
 from pm4py.objects.petri_net.exporter import exporter as pnml_exporter
+from pm4py.objects.petri_net.importer import importer as pnml_importer
+from pm4py.objects.process_tree.exporter import exporter as ptml_exporter
 from pm4py.visualization.petri_net import visualizer as pn_visualizer
 
 try:
     # Prefer package-relative imports when run as a module
-    from .utils import Utils as util
+    from .utils import Utils as util, load_cached, ensure_dir
     from .config import PROCESS_DISCOVERY, SAMPLE_FRACTION, XES_OUTPUT_PATH, RECOMMENDED_CURRICULUM
 except ImportError:
     # Fallback for direct execution without -m
-    from utils import Utils as util
+    from utils import Utils as util, load_cached, ensure_dir
     from config import PROCESS_DISCOVERY, SAMPLE_FRACTION, XES_OUTPUT_PATH, RECOMMENDED_CURRICULUM
 
+# Set once dot has been found; see _ensure_graphviz_on_path
+_GRAPHVIZ_READY = False
+
+
 def _ensure_graphviz_on_path() -> None:
     """
     Make sure Graphviz binaries (dot) are reachable.
     - Honor GRAPHVIZ_BIN env var if set (any OS).
     - Keep existing Windows portable default as a fallback.
-    - Fail fast with a clear error if dot is still missing.
+    - Fail with a clear error if dot is still missing.
+    Called before the first render rather than at import, so importing this
+    module never probes PATH.
     """
+    global _GRAPHVIZ_READY
+    if _GRAPHVIZ_READY:
+        return
+
     custom_bin = os.environ.get("GRAPHVIZ_BIN")
     if custom_bin:
         os.environ["PATH"] = custom_bin + os.pathsep + os.environ["PATH"]
@@ -47,8 +65,81 @@ def _ensure_graphviz_on_path() -> None:
             "Install graphviz (e.g., apt install graphviz / brew install graphviz) "
             "or set GRAPHVIZ_BIN to its bin directory."
         )
+    _GRAPHVIZ_READY = True
+
+# Optional Rust XES parser; falls back to pm4py's line-by-line importer
+HAS_RUSTXES = importlib.util.find_spec("rustxes") is not None
 
-_ensure_graphviz_on_path()
+# Event attributes the miners and the summary actually read
+DISCOVERY_ATTRIBUTES = {"concept:name", "time:timestamp"}
+
+
+def _import_event_log(path):
+    """
+    Import an XES file as a pm4py EventLog, via rustxes when installed.
+    The parse is memoised on disk (see utils.load_cached), so repeated runs
+    against an unchanged log skip the XML entirely.
+    """
+    if not HAS_RUSTXES:
+        # Streaming parser over pm4py's own XES layout; discovery only needs
+        # activities and timestamps, so other event attributes are skipped
+        variant = xes_importer.Variants.LINE_BY_LINE
+        parameters = {
+            variant.value.Parameters.SET_ATTRIBUTES_TO_READ: DISCOVERY_ATTRIBUTES
+        }
+        return load_cached(
+            path,
+            lambda p: xes_importer.apply(p, variant=variant, parameters=parameters),
+            tag="eventlog:" + ",".join(sorted(DISCOVERY_ATTRIBUTES)),
+        )
+
+    variant = xes_importer.Variants.RUSTXES
+    # The miners and _summarize_log iterate traces, so ask for an EventLog
+    parameters = {variant.value.Parameters.RETURN_LEGACY_LOG_OBJECT: True}
+    return load_cached(
+        path,
+        lambda p: xes_importer.apply(p, variant=variant, parameters=parameters),
+        tag="eventlog",
+    )
+
+
+def _discover_heuristics_pnml(variants):
+    """
+    Worker-side heuristics miner, fed from variant statistics instead of the
+    log. Every relation the miner counts (directly-follows, window-2 pairs,
+    triples, start/end and activity occurrences) is a per-trace count, so
+    weighting each variant by its frequency gives the same inputs as its six
+    passes over the events. The net comes back as PNML bytes: its place/arc
+    cross-references are too deep to pickle directly.
+    """
+    dfg, dfg_window_2, freq_triples = Counter(), Counter(), Counter()
+    start_activities, end_activities, occurrences = Counter(), Counter(), Counter()
+    for v in variants:
+        trace, count = v["variant"], v["count"]
+        if not trace:
+            continue
+        start_activities[trace[0]] += count
+        end_activities[trace[-1]] += count
+        for activity in trace:
+            occurrences[activity] += count
+        for pair in zip(trace, trace[1:]):
+            dfg[pair] += count
+        for pair in zip(trace, trace[2:]):
+            dfg_window_2[pair] += count
+        for triple in zip(trace, trace[1:], trace[2:]):
+            freq_triples[triple] += count
+
+    heu_net = apply_heu_dfg(
+        dfg,
+        activities=list(occurrences),
+        activities_occurrences=dict(occurrences),
+        start_activities=dict(start_activities),
+        end_activities=dict(end_activities),
+        dfg_window_2=dfg_window_2,
+        freq_triples=dict(freq_triples),
+    )
+    net, im, fm = hn_converter.apply(heu_net)
+    return pnml_exporter.serialize(net, im, final_marking=fm)
 
 
 class ProcessDiscovery:
@@ -64,21 +155,30 @@ class ProcessDiscovery:
         sample_fraction=SAMPLE_FRACTION,
         recommended_curriculum=RECOMMENDED_CURRICULUM,
         max_traces=10, # cap per-group for readability
+        use_imd=False, # DFG-based Inductive Miner: faster on big logs, coarser model
     ):
         self.output_dir = output_dir
-        os.makedirs(self.output_dir, exist_ok=True)
+        ensure_dir(self.output_dir)
 
         self.sample_fraction = sample_fraction
         self.recommended_curriculum = recommended_curriculum
         self.max_traces = max_traces
+        self.use_imd = use_imd
 
-        self.event_log = event_log or xes_importer.apply(XES_OUTPUT_PATH)
+        self.event_log = event_log or _import_event_log(XES_OUTPUT_PATH)
+        self._variants = None  # variant statistics, filled by _summarize_log
+        self._tree = None  # inductive process tree, filled by _run_inductive_miner
 
     def run(self) -> None:
         self._summarize_log()
         # self._run_alpha_miner()
-        self._run_inductive_miner()
-        self._run_heuristics_miner()
+        # The heuristics miner does not depend on the inductive one, so it
+        # runs in a worker process meanwhile; models are saved in run order.
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            heuristics = pool.submit(_discover_heuristics_pnml, self._variants)
+            self._run_inductive_miner()
+            net, im, fm = pnml_importer.deserialize(heuristics.result())
+        self._save_model(net, im, fm, "heuristics_miner")
         self._generate_curriculum_model()
         self._save_process_tree()
 
@@ -86,30 +186,37 @@ class ProcessDiscovery:
         activity_key = "concept:name"
         parameters = {case_statistics.Parameters.ACTIVITY_KEY: activity_key}
 
+        # One pass over the events; activities and event counts then come
+        # from the (far fewer) variants instead of rescanning every event.
+        self._variants = case_statistics.get_variant_statistics(
+            self.event_log, parameters=parameters
+        )
+
         print("Summary:")
         print("  Traces:", len(self.event_log))
-        print("  Events:", sum(len(t) for t in self.event_log))
+        print("  Events:", sum(v["count"] * len(v["variant"]) for v in self._variants))
         print(
             "  Activities:",
-            len({e[activity_key] for t in self.event_log for e in t}),
-        )
-        print(
-            "  Variants:",
-            len(case_statistics.get_variant_statistics(self.event_log)),
+            len({a for v in self._variants for a in v["variant"]}),
         )
+        print("  Variants:", len(self._variants))
 
     def _run_alpha_miner(self):
         net, im, fm = discover_petri_net_alpha(self.event_log)
         self._save_model(net, im, fm, "alpha_miner")
 
     def _run_inductive_miner(self):
-        net, im, fm = discover_petri_net_inductive(self.event_log)
+        # discover_petri_net_inductive is tree discovery + conversion; keep
+        # the tree so _save_process_tree does not mine the log a second time
+        if self.use_imd:
+            self._tree = inductive_miner.apply(
+                self.event_log, variant=inductive_miner.Variants.IMd
+            )
+        else:
+            self._tree = discover_process_tree_inductive(self.event_log)
+        net, im, fm = convert_to_petri_net(self._tree)
         self._save_model(net, im, fm, "inductive_miner")
 
-    def _run_heuristics_miner(self):
-        net, im, fm = discover_heuristics_net(self.event_log)
-        self._save_model(net, im, fm, "heuristics_miner")
-
     def _generate_curriculum_model(self):
         # 1. Build a synthetic trace
         trace = Trace()
@@ -134,31 +241,27 @@ class ProcessDiscovery:
         net, im, fm = discover_petri_net_inductive(log)
 
         # 4. Save PNML + PNG
-        pnml_path = os.path.join(self.output_dir, "curriculum_model.pnml")
-        pnml_exporter.apply(net, im, pnml_path, final_marking=fm)
-
-        png_path = os.path.join(self.output_dir, "curriculum_model.png")
-        gviz = pn_visualizer.apply(net, im, fm)
-        pn_visualizer.save(gviz, png_path)
-
-        print(f"Saved: {png_path}")
+        self._save_model(net, im, fm, "curriculum_model")
 
     def _save_model(self, net, im, fm, name):
         pnml = os.path.join(self.output_dir, f"{name}.pnml")
         pnml_exporter.apply(net, im, pnml, final_marking=fm)
 
         png = os.path.join(self.output_dir, f"{name}.png")
+        _ensure_graphviz_on_path()
         gviz = pn_visualizer.apply(net, im, fm)
         pn_visualizer.save(gviz, png)
 
         print(f"Saved: {png}")
 
     def _save_process_tree(self):
-        tree = discover_process_tree_inductive(self.event_log)
+        tree = self._tree
+        if tree is None:
+            tree = discover_process_tree_inductive(self.event_log)
         ptml = os.path.join(self.output_dir, "process_tree.ptml")
-
-        with open(ptml, "w") as f:
-            f.write(str(tree))
+        # Native PTML export: streamed XML that pm4py can import again,
+        # rather than building the tree's repr string in memory
+        ptml_exporter.apply(tree, ptml)
 
         print(f"Saved: {ptml}")
 
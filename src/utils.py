@@ -1,31 +1,64 @@
+import hashlib
 import os
+import pickle
+from importlib.metadata import version
+from pathlib import Path
 
 try:
     # Prefer package-relative imports when run with -m
-    from .config import (
-        RESULTS_PATH,
-        DATA_PATH,
-        PROCESS_DISCOVERY,
-        PERFORMANCE_PATH,
-        RAW_DATA_PATH,
-        PROCESSED_DATA_PATH,
-        SAMPLED_DATA_PATH,
-        SAMPLE_FRACTION,
-        XES_OUTPUT_PATH,
-    )
+    from .config import DATA_PATH, PROCESS_DISCOVERY, PERFORMANCE_PATH, CACHE_PATH
 except ImportError:
     # Fallback for direct execution without -m
-    from config import (
-        RESULTS_PATH,
-        DATA_PATH,
-        PROCESS_DISCOVERY,
-        PERFORMANCE_PATH,
-        RAW_DATA_PATH,
-        PROCESSED_DATA_PATH,
-        SAMPLED_DATA_PATH,
-        SAMPLE_FRACTION,
-        XES_OUTPUT_PATH,
-    )
+    from config import DATA_PATH, PROCESS_DISCOVERY, PERFORMANCE_PATH, CACHE_PATH
+
+# Directories already created in this process; avoids repeated stat/mkdir calls
+_SEEN_DIRS = set()
+
+# Libraries whose objects end up in load_cached pickles
+_CACHE_LIBS = ":".join(f"{lib}={version(lib)}" for lib in ("pandas", "pm4py"))
+
+
+def ensure_dir(path):
+    """Create `path` (and parents) once per process."""
+    if path in _SEEN_DIRS:
+        return
+    Path(path).mkdir(parents=True, exist_ok=True)
+    _SEEN_DIRS.add(path)
+
+
+def load_cached(path, loader, tag=""):
+    """
+    Return `loader(path)`, memoised on disk as a pickle.
+    Each (absolute path, `tag`) pair owns one cache file; use `tag` when the
+    loader's options change its output. The source mtime is stored in the
+    file, so editing or regenerating the source overwrites the entry instead
+    of adding a new one. pandas/pm4py versions are part of the key, and an
+    entry that fails to load for any reason is treated as a miss.
+    """
+    mtime = os.stat(path).st_mtime_ns
+    key = hashlib.blake2b(
+        f"{os.path.abspath(path)}:{tag}:{_CACHE_LIBS}".encode(), digest_size=16
+    ).hexdigest()
+    ensure_dir(CACHE_PATH)
+    cache_file = os.path.join(CACHE_PATH, f"{key}.pkl")
+
+    try:
+        with open(cache_file, "rb") as f:
+            # The mtime is pickled first, so a stale entry is never unpickled
+            if pickle.load(f) == mtime:
+                return pickle.load(f)
+    except Exception:
+        pass
+
+    obj = loader(path)
+
+    # Write-then-rename so concurrent workers never read a partial pickle
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_file, "wb") as f:
+        pickle.dump(mtime, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, cache_file)
+    return obj
 
 
 class Utils:
@@ -36,51 +69,6 @@ class Utils:
         self._ensure_dir_exists()
 
     def _ensure_dir_exists(self):
-        if not os.path.exists(RESULTS_PATH): os.makedirs(RESULTS_PATH)
-        if not os.path.exists(DATA_PATH): os.makedirs(DATA_PATH)
-        if not os.path.exists(PROCESS_DISCOVERY): os.makedirs(PROCESS_DISCOVERY)
-        if not os.path.exists(PERFORMANCE_PATH): os.makedirs(PERFORMANCE_PATH)
-
-    def load_config_by_platform():
-        """
-        Re-import config names in whichever mode we are running:
-        package (`python -m src.*`) or direct script execution.
-        """
-        global RESULTS_PATH, DATA_PATH, PROCESS_DISCOVERY, PERFORMANCE_PATH
-        global RAW_DATA_PATH, PROCESSED_DATA_PATH, SAMPLED_DATA_PATH
-        global SAMPLE_FRACTION, XES_OUTPUT_PATH
-
-        try:
-            from .config import (
-                RESULTS_PATH as _R,
-                DATA_PATH as _D,
-                PROCESS_DISCOVERY as _M,
-                PERFORMANCE_PATH as _P,
-                RAW_DATA_PATH as _RAW,
-                PROCESSED_DATA_PATH as _PROC,
-                SAMPLED_DATA_PATH as _SAMP,
-                SAMPLE_FRACTION as _SF,
-                XES_OUTPUT_PATH as _XES,
-            )
-        except ImportError:
-            from config import (
-                RESULTS_PATH as _R,
-                DATA_PATH as _D,
-                PROCESS_DISCOVERY as _M,
-                PERFORMANCE_PATH as _P,
-                RAW_DATA_PATH as _RAW,
-                PROCESSED_DATA_PATH as _PROC,
-                SAMPLED_DATA_PATH as _SAMP,
-                SAMPLE_FRACTION as _SF,
-                XES_OUTPUT_PATH as _XES,
-            )
-
-        RESULTS_PATH = _R
-        DATA_PATH = _D
-        PROCESS_DISCOVERY = _M
-        PERFORMANCE_PATH = _P
-        RAW_DATA_PATH = _RAW
-        PROCESSED_DATA_PATH = _PROC
-        SAMPLED_DATA_PATH = _SAMP
-        SAMPLE_FRACTION = _SF
-        XES_OUTPUT_PATH = _XES
+        # parents=True creates RESULTS_PATH along with the first leaf
+        for path in (DATA_PATH, PROCESS_DISCOVERY, PERFORMANCE_PATH):
+            ensure_dir(path)